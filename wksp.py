@@ -4,18 +4,213 @@ from IPython.display import HTML, display, Javascript
 from IPython import get_ipython
 
 import numpy as np
-from pandas import DataFrame
+from pandas import DataFrame, Series, Index, MultiIndex, concat
 from types import ModuleType, FunctionType
 import os
+import re
+import importlib.util
+import multiprocessing
+import fnmatch
+import sys
+import gc
+import weakref
 import pickle
 from time import sleep
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 import matplotlib.pyplot as plt
-from matplotlib.pylab import mpl
+from matplotlib.collections import LineCollection
+
+# pyarrow (parquet / feather) is optional and only imported when used :
+_HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
 
 __all__ = ['workspace']
 
 
+def _fmtBytes(nbytes):
+    """Human readable string of a number of bytes"""
+    sign = '-' if nbytes < 0 else ''
+    nbytes = abs(float(nbytes))
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if nbytes < 1024.:
+            return '{0}{1:.1f} {2}'.format(sign, nbytes, unit)
+        nbytes /= 1024.
+    return '{0}{1:.1f} TB'.format(sign, nbytes)
+
+
+def _renderFig(var, pltfcn, kwargs, fname, dpi, tit='', xlab='', ylab=''):
+    """Render and save a figure in a worker process. The figure is created
+    without pyplot so that no interactive backend is involved"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    getattr(ax, pltfcn)(var, **kwargs)
+    ax.set_title(tit), ax.set_xlabel(xlab), ax.set_ylabel(ylab)
+    fig.savefig(fname, dpi=dpi, bbox_inches='tight')
+    return fname
+
+
+def _saveColumnar(var, folder, fmt='numpy'):
+    """Save a DataFrame or a Series column by column in folder ('numpy' : one
+    .npy per column, 'parquet' / 'feather' : pyarrow). Return the metadata
+    needed to restore it. The format in the metadata is 'numpy' if pyarrow
+    can't store the column names (not unique strings or MultiIndex)"""
+    isSeries = isinstance(var, Series)
+    # Series get a string column name (their own name is in the metadata) :
+    df = var.to_frame(name='__series__') if isSeries else var
+    multiCol = isinstance(df.columns, MultiIndex)
+    if multiCol or df.columns.has_duplicates or not all([isinstance(k, str) for k in df.columns]):
+        fmt = 'numpy'
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    meta = {'kind': 'series' if isSeries else 'dataframe', 'format': fmt,
+            'name': var.name if isSeries else None, 'columns': list(df.columns),
+            'colnames': list(df.columns.names) if multiCol else None,
+            'dtypes': [str(k) for k in df.dtypes], 'nrows': df.shape[0],
+            'index': {'names': list(df.index.names), 'multi': isinstance(df.index, MultiIndex)}}
+    if fmt == 'parquet':
+        # Index always stored as columns, small row groups for row ranges :
+        df.to_parquet(os.path.join(folder, 'data.parquet'), index=True,
+                      row_group_size=100000)
+    elif fmt == 'feather':
+        idxNames = ['__index_level_{0}__'.format(k) for k in range(df.index.nlevels)]
+        # Uncompressed so that row ranges can be read from a memory map :
+        df.rename_axis(idxNames).reset_index().to_feather(
+            os.path.join(folder, 'data.feather'), compression='uncompressed')
+    else:
+        for k in range(df.shape[1]):
+            np.save(os.path.join(folder, 'c{0}.npy'.format(k)), np.asarray(df.iloc[:, k]))
+        np.save(os.path.join(folder, 'index.npy'), np.asarray(df.index))
+    return meta
+
+
+def _loadColumnar(meta, folder, cols=None, rows=None):
+    """Restore a DataFrame or a Series saved by _saveColumnar. Only the
+    columns in cols (names) and the rows in rows (slice) are restored. With
+    the numpy format, columns are memory-mapped so only those rows are read"""
+    names = [str(k) for k in meta['columns']]
+    if cols and (meta['kind'] == 'dataframe'):
+        sel = [names.index(k) for k in cols if k in names]
+    else:
+        sel = list(range(len(names)))
+    selNames = [meta['columns'][k] for k in sel]
+    rows = slice(None) if rows is None else rows
+    start, stop, _ = rows.indices(meta['nrows'])
+    stop = max(start, stop)
+    if meta['format'] == 'parquet':
+        # Only read the row groups overlapping the row range :
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(os.path.join(folder, 'data.parquet'))
+        groups, first, offset = [], None, 0
+        for k in range(pf.num_row_groups):
+            nGroup = pf.metadata.row_group(k).num_rows
+            if (offset < stop) and (offset + nGroup > start):
+                groups.append(k)
+                first = offset if first is None else first
+            offset += nGroup
+        table = pf.read_row_groups(groups, columns=selNames, use_pandas_metadata=True)
+        first = start if first is None else first
+        df = table.slice(start - first, stop - start).to_pandas()
+    elif meta['format'] == 'feather':
+        import pyarrow.feather as pf
+        idxNames = ['__index_level_{0}__'.format(k) for k in range(len(meta['index']['names']))]
+        table = pf.read_table(os.path.join(folder, 'data.feather'), columns=idxNames+selNames,
+                              memory_map=True)
+        df = table.slice(start, stop - start).to_pandas()
+        df = df.set_index(idxNames)
+        df.index.names = meta['index']['names']
+    else:
+        def read(fname):
+            try:
+                arr = np.load(fname, mmap_mode='r')
+            except ValueError:  # Python objects can't be memory-mapped
+                arr = np.load(fname, allow_pickle=True)
+            return np.array(arr[rows])
+        index = read(os.path.join(folder, 'index.npy'))
+        if meta['index']['multi']:
+            index = MultiIndex.from_tuples(index, names=meta['index']['names'])
+        else:
+            index = Index(index, name=meta['index']['names'][0])
+        cols = []
+        for k in sel:
+            col = Series(read(os.path.join(folder, 'c{0}.npy'.format(k))), index=index)
+            try:
+                col = col.astype(meta['dtypes'][k])
+            except (TypeError, ValueError):
+                pass
+            cols.append(col)
+        df = concat(cols, axis=1) if cols else DataFrame(index=index)
+        df.columns = selNames
+    if meta.get('colnames') and selNames:
+        df.columns = MultiIndex.from_tuples(selNames, names=meta['colnames'])
+    if meta['kind'] == 'series':
+        df = df.iloc[:, 0]
+        df.name = meta['name']
+    return df
+
+
+def _isLarge(v, budget):
+    """Check if v is an array backed by a memory map / external buffer or
+    bigger than the memory budget (in bytes)"""
+    if not isinstance(v, np.ndarray):
+        return False
+    if isinstance(v, np.memmap) or (v.nbytes > budget):
+        return True
+    base = v
+    while isinstance(base, np.ndarray) and (base.base is not None):
+        base = base.base
+    return (base is not v) and not isinstance(base, np.ndarray)
+
+
+def _axisSlice(ndim, axis, sl):
+    """Index tuple selecting sl along axis"""
+    idx = [slice(None)] * ndim
+    idx[axis] = sl
+    return tuple(idx)
+
+
+def _chunkIter(v, axis=0, start=0, stop=None, budget=256 * 1024**2, itemBytes=None):
+    """Iterate over v[start:stop] along axis by in-memory chunks of at most
+    budget bytes, so that only one chunk is paged in at a time. itemBytes is
+    the memory used per element while processing a chunk [def: itemsize]"""
+    stop = v.shape[axis] if stop is None else min(stop, v.shape[axis])
+    itemBytes = v.itemsize if itemBytes is None else itemBytes
+    rowBytes = max(1, itemBytes * (v.size // max(1, v.shape[axis])))
+    step = max(1, int(budget // rowBytes))
+    for k in range(start, stop, step):
+        yield np.array(v[_axisSlice(v.ndim, axis, slice(k, min(k + step, stop)))])
+
+
+def _chunkStats(v, axis=0, start=0, stop=None, budget=256 * 1024**2):
+    """Min, max, mean, std and number of NaN of v[start:stop] along axis,
+    computed chunk by chunk (pairwise update of mean and variance)"""
+    n, nNan, mean, m2 = 0, 0, 0., 0.
+    vmin, vmax = np.inf, -np.inf
+    # Per element : the chunk, its float64 copy, the NaN mask, the copy
+    # without NaN and the deviations :
+    itemBytes = v.itemsize + 3 * 8 + 1
+    for chunk in _chunkIter(v, axis, start, stop, budget, itemBytes):
+        c = chunk.ravel().astype(np.float64)
+        isnan = np.isnan(c)
+        nNan += int(isnan.sum())
+        c = c[~isnan]
+        if not c.size:
+            continue
+        cMean = c.mean()
+        dev = c - cMean
+        cM2 = np.square(dev, out=dev).sum()
+        delta, nTot = cMean - mean, n + c.size
+        mean += delta * c.size / nTot
+        m2 += cM2 + delta**2 * n * c.size / nTot
+        n = nTot
+        vmin, vmax = min(vmin, c.min()), max(vmax, c.max())
+    std = np.sqrt(m2 / n) if n else np.nan
+    return {'min': vmin if n else np.nan, 'max': vmax if n else np.nan,
+            'mean': mean if n else np.nan, 'std': std, 'nan': nNan}
+
+
 class _createWindow(object):
 
     """Class to create a window.
@@ -439,9 +634,16 @@ class workspace(_createWindow):
         self._namespace.shell = ipython.kernel.shell
         self._getVarInfo()
         self._defPyVar = ['int', 'float', 'tuple', 'ndarray', 'list', 'dict',
-                          'matrix', 'set', 'dataframe', 'series', 'str']
+                          'matrix', 'set', 'dataframe', 'series', 'str',
+                          'memmap']
         self._ipython = ipython
-        self._ipython.events.register('post_run_cell', self._fill)
+        self._ipython.events.register('post_run_cell', self._postRun)
+        # Memory history (one ring buffer per variable) :
+        self._memN = 20
+        self._memTop = 5
+        self._memCell = 0
+        self._memHist = {}
+        self._memIds = {}
         apply_color = {'background_color': '#A1B56C', 'color': '#282828', 'font_weight': 'bold'}
         clear_color = {'background_color': '#7cafc2', 'color': '#282828', 'font_weight': 'bold'}
 
@@ -477,14 +679,20 @@ class workspace(_createWindow):
         self._wLS_choice = wdg.ToggleButtons(options=['Save', 'Load'])
         self._wLS_path = wdg.Text(description='Path', width=250, placeholder='Leave empty for current directory', margin=5)
         self._wLS_file = wdg.Text(description='File', width=250, placeholder='Ex : myfile', margin=5)
-        self._wLS_var = wdg.Text(description='Variables', width=250, placeholder='Ex : "x, y, z". Empty save all visible variables', margin=5)
+        self._wLS_var = wdg.Text(description='Variables', width=250, placeholder='Ex : "x, y, z". Empty save all visible / load all variables', margin=5)
+        # Pandas objects (saved column by column) :
+        lsFmt = ['numpy', 'pickle'] + (['parquet', 'feather'] if _HAS_PYARROW else [])
+        self._wLS_fmt = wdg.Dropdown(description='Pandas', options=lsFmt)
+        self._wLS_col = wdg.Text(description='Columns', width=250, placeholder='Load only. Ex : "a, b". Empty load all columns', margin=5)
+        self._wLS_rows = wdg.Text(description='Rows', width=250, placeholder='Load only. Ex : 0:1000. Empty load all rows', margin=5)
         _wLS_apply = wdg.Button(description='Apply', button_style='success', margin=20, **apply_color)
         _wLS_clear = wdg.Button(description='Clear', button_style='info', margin=20, **clear_color)
         _wLS_apply.on_click(self._loadsave)
         _wLS_clear.on_click(self._clearLS)
         LS_button = wdg.HBox(children=[_wLS_apply, _wLS_clear])
         self._wLS_txt = wdg.Latex(value='', color='#A1B56C', margin=5, font_weight='bold', visible=False)
-        _LS_cat = wdg.VBox(children=[self._wLS_choice, self._wLS_path, self._wLS_file, self._wLS_var, self._wLS_txt, LS_button])
+        _LS_cat = wdg.VBox(children=[self._wLS_choice, self._wLS_path, self._wLS_file, self._wLS_var,
+                                     self._wLS_fmt, self._wLS_col, self._wLS_rows, self._wLS_txt, LS_button])
 
         # -> Operation :
         self._wOp_ass = wdg.Text(description='Assign', width=300, placeholder='variable')
@@ -495,31 +703,60 @@ class workspace(_createWindow):
         _wOp_apply.on_click(self._assignVar)
         _wOp_clear.on_click(self._clearVar)
         self._wOp_insp = wdg.Text(description='Inspect', width=300, placeholder='variable')
-        _Op_cat_w = wdg.VBox(children=[self._wOp_ass, self._wOp_to, Op_button, self._wOp_insp])
+        self._wOp_free = wdg.Text(description='Free', width=300, placeholder='Ex : "x, y, z"')
+        self._wOp_freeChk = wdg.Checkbox(description='Clear cached references', value=True)
+        _wOp_freeBut = wdg.Button(description='Free', button_style='success', margin=20, **apply_color)
+        _wOp_freeBut.on_click(self._freeVar)
+        self._wOp_txt = wdg.Latex(value='', color='#A1B56C', margin=5, font_weight='bold', visible=False)
+        _Op_cat_w = wdg.VBox(children=[self._wOp_ass, self._wOp_to, Op_button, self._wOp_insp,
+                                       self._wOp_free, self._wOp_freeChk, self._wOp_txt, _wOp_freeBut])
+
+        # -> Memory :
+        self._wMem_hist = wdg.Text(description='History', width=250, placeholder='Number of cells [def: 20]')
+        self._wMem_top = wdg.Text(description='Top', width=250, placeholder='Number of variables [def: 5]')
+        _wMem_apply = wdg.Button(description='Apply', button_style='success', margin=20, **apply_color)
+        _wMem_clear = wdg.Button(description='Clear', button_style='info', margin=20, **clear_color)
+        _wMem_apply.on_click(self._memSettings)
+        _wMem_clear.on_click(self._clearMem)
+        Mem_button = wdg.HBox(children=[_wMem_apply, _wMem_clear])
+        self._wMem_txt = wdg.HTML(value='', margin=5)
+        _Mem_cat = wdg.VBox(children=[self._wMem_hist, self._wMem_top, self._wMem_txt, Mem_button])
 
         # -> CAT :
         _subAccSt = wdg.Accordion(font_weight='bold', **wkth)
-        _subAccSt.children = [_wFlt_cat, _LS_cat, _Op_cat_w]
-        [_subAccSt.set_title(k, n) for k, n in enumerate(['Sorting', 'Save/Load','Variables'])]
+        _subAccSt.children = [_wFlt_cat, _LS_cat, _Op_cat_w, _Mem_cat]
+        [_subAccSt.set_title(k, n) for k, n in enumerate(['Sorting', 'Save/Load','Variables', 'Memory'])]
 
         # /////////////// VISUALIZATION \\\\\\\\\\\\\\\\\
         # -> Variable and function for plotting :
-        self._wVi_var = wdg.Text(description='Variables', width=250, placeholder='Ex : x')
+        self._wVi_var = wdg.Text(description='Variables', width=250, placeholder='Ex : "x, y" or "sig_*"')
         self._wVi_fcn = wdg.Dropdown(description='Function', options=['plot', 'imshow'])
+        # -> Many variables :
+        self._wVi_layout = wdg.Dropdown(description='Layout', options=['Grid', 'Overlay'])
+        self._wVi_share = wdg.Dropdown(description='Share axes', options=['none', 'x', 'y', 'both'])
         # -> Plot settings :
         self._wVi_tit = wdg.Text(description='Title', width=250, placeholder='Ex : My title')
         self._wVi_xlab = wdg.Text(description='X label', width=250, placeholder='Ex : time')
         self._wVi_ylab = wdg.Text(description='Y label', width=250, placeholder='Ex : Amplitude')
         self._wVi_cmap = wdg.Text(description='Colormap', width=250, placeholder='Ex : viridis')
         self._wVi_kwarg = wdg.Text(description='kwargs', width=250, placeholder='Ex : {}')
+        # -> Slice of large arrays :
+        self._wVi_axis = wdg.Text(description='Axis', width=250, placeholder='Ex : 0')
+        self._wVi_range = wdg.Text(description='Range', width=250, placeholder='Ex : 0:1000 or 5. Empty for all')
+        self._wVi_budget = wdg.Text(description='Budget', width=250, placeholder='Memory budget in MB [def: 256]')
+        self._wVi_stats = wdg.HTML(value='', margin=5)
         _ViS_apply = wdg.Button(description='Apply', button_style='success', margin=20, **apply_color)
         _ViS_clear = wdg.Button(description='Clear', button_style='info', margin=20, **clear_color)
+        _ViS_stats = wdg.Button(description='Stats', margin=20, **clear_color)
         _ViS_apply.on_click(self._plotVar)
         _ViS_clear.on_click(self._clearPlot)
-        ViS_button = wdg.HBox(children=[_ViS_apply, _ViS_clear])
+        _ViS_stats.on_click(self._statsVar)
+        ViS_button = wdg.HBox(children=[_ViS_apply, _ViS_stats, _ViS_clear])
         ViS_box = wdg.VBox(
-            children=[self._wVi_var, self._wVi_fcn, self._wVi_tit, self._wVi_xlab, self._wVi_ylab,
-                      self._wVi_cmap, self._wVi_kwarg, ViS_button])
+            children=[self._wVi_var, self._wVi_fcn, self._wVi_layout, self._wVi_share,
+                      self._wVi_tit, self._wVi_xlab, self._wVi_ylab,
+                      self._wVi_cmap, self._wVi_kwarg, self._wVi_axis, self._wVi_range,
+                      self._wVi_budget, self._wVi_stats, ViS_button])
 
         # -> Save the figure :
         self._wVi_path = wdg.Text(description='Path', width=250, placeholder='Leave empty for current directory')
@@ -532,25 +769,58 @@ class workspace(_createWindow):
         _Vi_apply.on_click(self._saveFig)
         _Vi_clear.on_click(self._clearFig)
         ViApp_button = wdg.HBox(children=[_Vi_apply, _Vi_clear])
+        self._wVi_batch = wdg.Checkbox(description='Batch (one file per variable)', value=False)
         self._wVi_txt = wdg.Latex(value='', color='#A1B56C', margin=5, font_weight='bold', visible=False)
-        _Vi_cat_w = wdg.VBox(children=[self._wVi_path, self._wVi_file, _ViQuality, self._wVi_txt, ViApp_button])
+        self._saveExec = None
+        self._batchExec, self._batchWorkers = None, 0
+        _Vi_cat_w = wdg.VBox(children=[self._wVi_path, self._wVi_file, _ViQuality, self._wVi_batch,
+                                       self._wVi_txt, ViApp_button])
 
         # -> CAT :
         _subAccVi = wdg.Accordion(font_weight='bold')
         _subAccVi.children = [ViS_box, _Vi_cat_w]
         [_subAccVi.set_title(k, n) for k, n in enumerate(['Settings', 'Save/Load'])]
 
+        # /////////////// VIEWER \\\\\\\\\\\\\\\\\
+        self._viewStart = 0
+        self._viewCache = {}
+        self._wVw_var = wdg.Text(description='Variable', width=250, placeholder='Ex : df')
+        self._wVw_col = wdg.Text(description='Columns', width=250, placeholder='Ex : "a, b". Empty for all columns')
+        self._wVw_sort = wdg.Text(description='Sort by', width=250, placeholder='Column. Empty to keep order')
+        self._wVw_order = wdg.ToggleButtons(options=['Ascending', 'Descending'], margin=5)
+        self._wVw_rows = wdg.Text(description='Rows', width=250, placeholder='Rows per page [def: 20]')
+        _wVw_apply = wdg.Button(description='Open', button_style='success', margin=20, **apply_color)
+        _wVw_prev = wdg.Button(description='<', margin=20, **clear_color)
+        _wVw_next = wdg.Button(description='>', margin=20, **clear_color)
+        _wVw_clear = wdg.Button(description='Clear', button_style='info', margin=20, **clear_color)
+        _wVw_apply.on_click(self._viewVar)
+        _wVw_prev.on_click(self._viewPrev)
+        _wVw_next.on_click(self._viewNext)
+        _wVw_clear.on_click(self._clearView)
+        Vw_button = wdg.HBox(children=[_wVw_apply, _wVw_prev, _wVw_next, _wVw_clear])
+        self._wVw_txt = wdg.HTML(value='', margin=5)
+        self._wVw_tab = wdg.HTML(value='', margin=5)
+        _viewBox = wdg.VBox(children=[self._wVw_var, self._wVw_col, self._wVw_sort, self._wVw_order,
+                                      self._wVw_rows, Vw_button, self._wVw_txt, self._wVw_tab])
+
         # /////////////// FINAL TAB \\\\\\\\\\\\\\\\\
         javaWin = {'win': '_wkt', 'clo': '_wkc', 'red': '_wkr', 'enl': '_wke', 'tab': '_wka', 'fit': '_wkf'}
         _createWindow.__init__(
-            self, children=[_tab, _subAccSt, _subAccVi], **javaWin,
-            title=['Workspace', 'Settings', 'Visualization'], xscroll=False,
+            self, children=[_tab, _subAccSt, _subAccVi, _viewBox], **javaWin,
+            title=['Workspace', 'Settings', 'Visualization', 'Viewer'], xscroll=False,
             yscroll=False, win_kwargs=wkth, tab_kwargs=wkth, but_kwargs=butbck,
             place='left', autoHide=autoHide)
         self._popout = self._tab
         self._fill()
 
     # /////////////// TABLE \\\\\\\\\\\\\\\\\
+    def _postRun(self, *arg):
+        """Executed after each cell : track memory then fill the table"""
+        self._trackMem()
+        # Cells can modify variables in place, so sorting orders are stale :
+        self._viewCache = {}
+        self._fill()
+
     def _fill(self, *arg):
         """Fill self with variable information."""
         # Get var, name, size and type :
@@ -563,8 +833,11 @@ class workspace(_createWindow):
         _typet = list(set(self._vartypes))
         _typet.sort()
         self._wFlt_type.options = ['All'] + _typet
+        # Memory growth :
+        growth = self._memGrowth()
+        self._memReport(growth)
         # Fill tab :
-        self._htmlTable(vName, vType, v, vSize)
+        self._htmlTable(vName, vType, v, vSize, hl=[k[0] for k in growth])
         self._popout.selected_index = 0
         # Add scroll
         jav = """
@@ -573,8 +846,11 @@ class workspace(_createWindow):
         """
         display(Javascript(jav))
 
-    def _htmlTable(self, vName, vType, v, vSize):
-        """Creation of the html table for the workspace"""
+    def _htmlTable(self, vName, vType, v, vSize, hl=[]):
+        """Creation of the html table for the workspace. Names in hl are
+        highlighted (variables that grew the most)"""
+        hlLayout = "<span style='color:#CF4A4C' title='Memory growth'>{0} &#9650</span>"
+        vName = [hlLayout.format(k) if k in hl else k for k in vName]
         cellLayout = """
         <div style='font-weight:bold; text-align:center'>{0}</div></td>""" + \
             """<td><div style='text-align:center'>{1}</div></td>""" + \
@@ -594,12 +870,21 @@ class workspace(_createWindow):
             </tr>
             <tr>
                 <td>""" + \
-                '</td></tr><tr><td>'.join([cellLayout.format(vName[k], vType[k], vSize[k], str(val)) for k, val in enumerate(v)]) + \
+                '</td></tr><tr><td>'.join([cellLayout.format(vName[k], vType[k], vSize[k], self._preview(val)) for k, val in enumerate(v)]) + \
                 """</td>
             </tr>
         </table>
         </div>"""
 
+    def _preview(self, val):
+        """Value displayed in the table. Large or memory-mapped arrays only
+        read their first elements"""
+        if _isLarge(val, self._getBudget()):
+            head = np.array(val[tuple([slice(0, 3)] * val.ndim)])
+            return '{0} {1}, {2}<br>{3}'.format(type(val).__name__, val.dtype,
+                                              _fmtBytes(val.nbytes), str(head))
+        return str(val)
+
     # /////////////// SETTINGS \\\\\\\\\\\\\\\\\
     # -> Sorting :
     def _FiltVar(self):
@@ -652,6 +937,7 @@ class workspace(_createWindow):
         # Get file name :
         file = self._wLS_file.value
         savefile = os.path.join(path, file)+'.pickle'
+        coldir = os.path.join(path, file)+'_columns'
         # Get if it's load or save :
         ldsv = self._wLS_choice.get_state()['selected_label']
         if ldsv == 'Save':
@@ -662,21 +948,53 @@ class workspace(_createWindow):
             else:          # Save defined variables
                 vName = var.replace(' ', '').split(sep=',')
             data = {name: self._namespace.shell.user_ns[name] for name in vName}
+            # Pandas objects are saved column by column :
+            fmt, downgraded = self._wLS_fmt.value, []
+            for name in vName:
+                if isinstance(data[name], (DataFrame, Series)) and (fmt != 'pickle'):
+                    meta = _saveColumnar(data[name], os.path.join(coldir, name), fmt)
+                    data[name] = {'__wksp_columnar__': meta}
+                    if meta['format'] != fmt:
+                        downgraded.append(name)
             # Save :
             with open(savefile, 'wb') as f:
                 pickle.dump(data, f)
             # Confirmation text :
-            self._wLS_txt.value = savefile+' saved :D'
+            txt = savefile+' saved :D'
+            if downgraded:
+                txt += ' Saved as numpy (column names not supported by '+fmt+') : '+', '.join(downgraded)+'.'
+            self._wLS_txt.value = txt
             self._wLS_txt.visible = True
         elif ldsv == 'Load':
             # Load data :
             with open(savefile, "rb") as f:
                 data = pickle.load(f)
+            # Selected variables, columns and rows :
+            var = self._wLS_var.value
+            vName = var.replace(' ', '').split(sep=',') if var != '' else list(data.keys())
+            cols = [k for k in self._wLS_col.value.replace(' ', '').split(sep=',') if k != '']
+            rows = self._wLS_rows.value.replace(' ', '')
+            if rows != '':
+                rows = [int(k) if k != '' else None for k in rows.split(':')[0:2]]
+                rows = slice(rows[0], rows[1] if len(rows) > 1 else rows[0] + 1)
+            else:
+                rows = None
             # Add variables to workspace :
-            for k in data.keys():
+            missing, pickled = [k for k in vName if k not in data], []
+            for k in [k for k in vName if k in data]:
+                if isinstance(data[k], dict) and ('__wksp_columnar__' in data[k]):
+                    data[k] = _loadColumnar(data[k]['__wksp_columnar__'],
+                                            os.path.join(coldir, k), cols, rows)
+                elif isinstance(data[k], (DataFrame, Series)) and (cols or rows):
+                    pickled.append(k)
                 self._namespace.shell.user_ns[k] = data[k]
             # Confirmation text :
-            self._wLS_txt.value = savefile+' loaded :D'
+            txt = savefile+' loaded :D'
+            if missing:
+                txt += ' Not in the file : '+', '.join(missing)+'.'
+            if pickled:
+                txt += ' Columns/Rows not applied to pickled '+', '.join(pickled)+'.'
+            self._wLS_txt.value = txt
             self._wLS_txt.visible = True
             sleep(2)
             self._fill()
@@ -688,6 +1006,9 @@ class workspace(_createWindow):
         self._wLS_path.value = ''
         self._wLS_file.value = ''
         self._wLS_var.value = ''
+        self._wLS_col.value = ''
+        self._wLS_rows.value = ''
+        self._wLS_fmt.selected_label = 'numpy'
 
     # -> Assign a new value to a variable :
     def _assignVar(self, *arg):
@@ -701,12 +1022,109 @@ class workspace(_createWindow):
         """Clear assign variables"""
         self._wOp_ass.value = ''
         self._wOp_to.value = ''
+        self._wOp_free.value = ''
+        self._wOp_txt.visible = False
+
+    # -> Free variables :
+    def _freeVar(self, *arg):
+        """Delete variables, clear the hidden references kept by the IPython
+        output caches and report the reclaimed memory"""
+        ns = self._namespace.shell.user_ns
+        names = [k for k in self._wOp_free.value.replace(' ', '').split(sep=',') if k != '']
+        vName = [k for k in names if k in ns]
+        missing = [k for k in names if k not in ns]
+        self._wOp_txt.visible = True
+        if not vName:
+            self._wOp_txt.value = 'No variable to free' + \
+                (' : '+', '.join(missing)+' not found' if missing else '')
+            return
+        clear = self._wOp_freeChk.value
+        vBytes = self._getVarBytes(vName)
+        # Watch each freed object once (aliases share the same object) with
+        # a weak reference, or a strong one if it can't be weakly referenced :
+        weak, strong, refs = {}, {}, []
+        for n, nb in zip(vName, vBytes):
+            obj = ns[n]
+            if (id(obj) not in weak) and (id(obj) not in strong):
+                try:
+                    weak[id(obj)] = (weakref.ref(obj), nb)
+                except TypeError:
+                    strong[id(obj)] = (obj, nb)
+            refs.extend([k for k in self._findRefs(obj, exclude=vName) if k[0] not in [i[0] for i in refs]])
+            del ns[n]
+            self._dropCaches(n)
+        obj = None
+        # Clear cached references :
+        cleared = [k for k in refs if k[3]] if clear else []
+        for label, container, key, _ in cleared:
+            if isinstance(container, dict):
+                if key in ['_', '__', '___']:
+                    container[key] = ''
+                else:
+                    container.pop(key, None)
+            else:
+                setattr(container, key, '')
+        refs, container = [k[0] for k in refs if not k[3] or not clear], None
+        gc.collect()
+        # Reclaimed memory :
+        freed = sum([nb for ref, nb in weak.values() if ref() is None])
+        for obj, nb in strong.values():
+            # Only referenced by strong, the loop and getrefcount itself :
+            freed += nb if sys.getrefcount(obj) <= 3 else 0
+        obj, strong = None, None
+        # Confirmation text :
+        txt = ', '.join(vName)+' deleted : '+_fmtBytes(freed)+' reclaimed'
+        if missing:
+            txt += '. Not found : '+', '.join(missing)
+        if cleared:
+            txt += '. Cleared : '+', '.join([k[0] for k in cleared])
+        if refs:
+            txt += '. Still referenced by : '+', '.join(refs)
+        self._wOp_txt.value = txt
+        self._fill()
+
+    def _findRefs(self, obj, exclude=[]):
+        """Find references to obj in the user namespace and in the IPython
+        output caches. Return a list of (label, container, key, cache) where
+        cache is True for references that can be cleared"""
+        shell = self._namespace.shell
+        ns = shell.user_ns
+        refs = []
+        # User namespace (_, __, ___, _N are output caches) :
+        for k, v in ns.items():
+            if (v is obj) and (k not in exclude):
+                cache = (k in ['_', '__', '___']) or (re.match(r'^_\d+$', k) is not None)
+                refs.append((k, ns, k, cache))
+        # Out dictionary :
+        if shell.history_manager is not None:
+            out = shell.history_manager.output_hist
+            for k, v in out.items():
+                if v is obj:
+                    refs.append(('Out['+str(k)+']', out, k, True))
+        # Display hook :
+        for k in ['_', '__', '___']:
+            if getattr(shell.displayhook, k, None) is obj:
+                refs.append(('displayhook.'+k, shell.displayhook, k, True))
+        return refs
+
+    def _dropCaches(self, name):
+        """Drop everything the workspace caches about a variable"""
+        self._memIds.pop(name, None)
+        self._memHist.pop(name, None)
+        self._viewCache.pop(name, None)
 
     # /////////////// VISUALIZATION \\\\\\\\\\\\\\\\\
     def _plotVar(self, *arg):
-        """Plot a variable"""
-        varname = self._wVi_var.value
-        var = self._namespace.shell.user_ns[varname]  # Get variable
+        """Plot a variable, or many variables in a single figure (grid of
+        subplots or overlaid 1-D series)"""
+        vName = self._getPlotNames()
+        if not vName:
+            self._wVi_stats.value = 'No variable matching <b>{0}</b>'.format(self._wVi_var.value)
+            return
+        vName = self._checkAxis(vName)
+        if not vName:
+            return
+        var = [self._getPlotVar(name) for name in vName]  # Get variables
         pltfcn = self._wVi_fcn.value  # Plotting function
         tit = self._wVi_tit.value  # title
         xlab = self._wVi_xlab.value  # xlabel
@@ -719,13 +1137,112 @@ class workspace(_createWindow):
         if kwargs == '':
             kwargs = '{}'
         plt.set_cmap(cmap)
-
-        pltstr = 'plt.'+pltfcn+'(var, **'+kwargs+')'
-        eval(pltstr)
-        plt.title(tit), plt.xlabel(xlab), plt.ylabel(ylab)
+        kwargs = eval(kwargs)
+
+        if len(var) == 1:
+            getattr(plt, pltfcn)(var[0], **kwargs)
+            plt.title(tit), plt.xlabel(xlab), plt.ylabel(ylab)
+        elif (pltfcn == 'plot') and (self._wVi_layout.value == 'Overlay'):
+            fig, ax = plt.subplots()
+            self._lineCollection(ax, [k for v in var for k in self._getSeries(v)], cmap, kwargs)
+            ax.set_title(tit), ax.set_xlabel(xlab), ax.set_ylabel(ylab)
+        else:
+            self._plotGrid(vName, var, pltfcn, cmap, kwargs, tit, xlab, ylab)
         self._fig = plt.gcf()
         plt.show()
 
+    def _getPlotNames(self):
+        """Get the names of the variables to plot. Glob patterns (Ex : sig_*)
+        are matched against the visible numeric variables of the workspace"""
+        vName = []
+        self._getVarInfo()
+        ns = self._namespace.shell.user_ns
+        visible = [n for n in self._FiltVar()[0] if self._isNumeric(ns[n])]
+        for k in self._wVi_var.value.replace(' ', '').split(sep=','):
+            if any([c in k for c in '*?[']):
+                vName.extend([n for n in fnmatch.filter(visible, k) if n not in vName])
+            elif (k in ns) and (k not in vName):
+                vName.append(k)
+        return vName
+
+    def _getPlotVar(self, name):
+        """Get a variable to plot (sliced if it's an array)"""
+        var = self._namespace.shell.user_ns[name]
+        if isinstance(var, np.ndarray) and var.ndim:
+            var = self._plotSlice(var)
+        return var
+
+    def _isNumeric(self, var):
+        """Check if a variable is a real numeric array, DataFrame or Series"""
+        if isinstance(var, (np.ndarray, Series)):
+            return var.dtype.kind in 'biuf'
+        elif isinstance(var, DataFrame):
+            return all([k.kind in 'biuf' for k in var.dtypes])
+        return False
+
+    def _getSeries(self, var):
+        """Split a variable into (x, y) 1-D series (columns for 2-D, like
+        plt.plot). Pandas objects use their index as x"""
+        if isinstance(var, Series):
+            return [(var.index.values, var.values)]
+        elif isinstance(var, DataFrame):
+            return [(var.index.values, var.iloc[:, k].values) for k in range(var.shape[1])]
+        var = np.asarray(var)
+        if var.ndim == 2:
+            return [(np.arange(var.shape[0]), k) for k in var.T]
+        var = var.ravel()
+        return [(np.arange(len(var)), var)]
+
+    def _lineCollection(self, ax, series, cmap, kwargs):
+        """Draw many 1-D series with a single LineCollection. Series are
+        plotted one by one if kwargs are only understood by plt.plot (Ex :
+        marker) or if x is not numeric (Ex : dates)"""
+        kw = dict(kwargs)
+        if 'c' in kw:
+            kw['color'] = kw.pop('c')
+        colors = plt.get_cmap(cmap)(np.linspace(0., 1., len(series)))
+        lcKw = ['color', 'colors', 'linewidth', 'linewidths', 'lw', 'linestyle',
+                'linestyles', 'ls', 'alpha', 'label', 'zorder', 'antialiased', 'aa']
+        numX = all([np.asarray(x).dtype.kind in 'biuf' for x, _ in series])
+        if (not numX) or any([k not in lcKw for k in kw.keys()]):
+            userColors = kw.pop('colors', None)
+            if userColors is not None:
+                colors = [userColors] * len(series) if isinstance(userColors, str) else userColors
+            for num, (x, y) in enumerate(series):
+                if ('color' not in kw) and ((len(series) > 1) or (userColors is not None)):
+                    ax.plot(x, y, color=colors[num], **kw)
+                else:
+                    ax.plot(x, y, **kw)
+            return
+        segments = [np.column_stack([x, y]) for x, y in series]
+        if ('color' not in kw) and ('colors' not in kw) and (len(series) > 1):
+            kw['colors'] = colors
+        ax.add_collection(LineCollection(segments, **kw))
+        ax.autoscale_view()
+
+    def _plotGrid(self, vName, var, pltfcn, cmap, kwargs, tit, xlab, ylab):
+        """Small multiples : one subplot per variable in a single figure"""
+        share = self._wVi_share.value
+        ncols = int(np.ceil(np.sqrt(len(var))))
+        nrows = int(np.ceil(len(var) / ncols))
+        fig, axs = plt.subplots(nrows, ncols, squeeze=False,
+                                sharex=share in ['x', 'both'],
+                                sharey=share in ['y', 'both'])
+        for k, ax in enumerate(axs.ravel()):
+            if k >= len(var):
+                ax.set_visible(False)
+                continue
+            if pltfcn == 'plot':
+                self._lineCollection(ax, self._getSeries(var[k]), cmap, kwargs)
+            else:
+                getattr(ax, pltfcn)(var[k], **kwargs)
+            ax.set_title(vName[k])
+            if k // ncols == nrows - 1:
+                ax.set_xlabel(xlab)
+            if k % ncols == 0:
+                ax.set_ylabel(ylab)
+        fig.suptitle(tit)
+
     def _clearPlot(self, *arg):
         """Clear the save and load module"""
         self._wVi_var.value = ''
@@ -734,10 +1251,86 @@ class workspace(_createWindow):
         self._wVi_ylab.value = ''
         self._wVi_cmap.value = ''
         self._wVi_kwarg.value = ''
+        self._wVi_axis.value = ''
+        self._wVi_range.value = ''
+        self._wVi_budget.value = ''
+        self._wVi_stats.value = ''
         self._wVi_fcn.selected_label = 'plot'
+        self._wVi_layout.selected_label = 'Grid'
+        self._wVi_share.selected_label = 'none'
+
+    # -> Large arrays :
+    def _getBudget(self):
+        """Get the memory budget (in bytes) for large arrays"""
+        budget = self._wVi_budget.value
+        return float(budget) * 1024**2 if budget != '' else 256 * 1024**2
+
+    def _getRange(self, var):
+        """Get the axis and the index (int or slice) to inspect"""
+        axis = int(self._wVi_axis.value) if self._wVi_axis.value != '' else 0
+        rng = self._wVi_range.value.replace(' ', '')
+        if rng == '':
+            return axis, slice(0, var.shape[axis])
+        elif ':' in rng:
+            start, stop = rng.split(':')[0:2]
+            start = int(start) if start != '' else 0
+            stop = int(stop) if stop != '' else var.shape[axis]
+            return axis, slice(start, min(stop, var.shape[axis]))
+        return axis, int(rng)
+
+    def _checkAxis(self, vName):
+        """Drop the arrays that don't have the selected axis and report them"""
+        axis = int(self._wVi_axis.value) if self._wVi_axis.value != '' else 0
+        ndim = [getattr(self._namespace.shell.user_ns[k], 'ndim', 0) for k in vName]
+        skip = [k for k, n in zip(vName, ndim) if n and not (-n <= axis < n)]
+        self._wVi_stats.value = 'No axis {0}, skipped : {1}'.format(axis, ', '.join(skip)) if skip else ''
+        return [k for k in vName if k not in skip]
+
+    def _plotSlice(self, var):
+        """Slice an array before plotting. If the slice is larger than the
+        memory budget, it is decimated along the axis"""
+        axis, idx = self._getRange(var)
+        if isinstance(idx, slice):
+            sub = var[_axisSlice(var.ndim, axis, idx)]
+            step = int(np.ceil(sub.nbytes / self._getBudget()))
+            if step > 1:
+                sub = sub[_axisSlice(var.ndim, axis, slice(None, None, step))]
+                self._wVi_stats.value += '<br>Decimated by {0} along axis {1}'.format(step, axis)
+        else:
+            sub = var[_axisSlice(var.ndim, axis, idx)]
+        return np.array(sub)
+
+    def _statsVar(self, *arg):
+        """Statistics of variables, computed by chunks for large arrays"""
+        vName = self._getPlotNames()
+        if not vName:
+            self._wVi_stats.value = 'No variable matching <b>{0}</b>'.format(self._wVi_var.value)
+            return
+        vName = self._checkAxis(vName)
+        skipped = self._wVi_stats.value
+        rowLayout = """<tr><td>{name}</td><td>{min:.4g}</td><td>{max:.4g}</td>""" + \
+            """<td>{mean:.4g}</td><td>{std:.4g}</td><td>{nan}</td></tr>"""
+        rows = []
+        for name in vName:
+            var = np.asanyarray(self._namespace.shell.user_ns[name])
+            if var.dtype.kind not in 'biuf':
+                rows.append('<tr><td>'+name+'</td><td colspan="5">Not a real numeric array</td></tr>')
+                continue
+            var = var.reshape(1) if var.ndim == 0 else var
+            axis, idx = self._getRange(var)
+            if not isinstance(idx, slice):
+                idx = slice(idx, idx + 1)
+            st = _chunkStats(var, axis, idx.start, idx.stop, self._getBudget())
+            rows.append(rowLayout.format(name=name, **st))
+        self._wVi_stats.value = skipped + """
+        <table class="table table-bordered table-striped'">
+            <tr><th>Name</th><th>Min</th><th>Max</th><th>Mean</th><th>Std</th><th>NaN</th></tr>
+            """ + ''.join(rows) + """
+        </table>"""
 
     def _saveFig(self, *arg):
-        """Save the current figure"""
+        """Save the current figure (or one figure per variable in batch
+        mode). Saving runs outside of the kernel thread"""
         path = self._wVi_path.value  # path
         file = self._wVi_file.value  # file
         ext = self._wVi_ext.get_state()['selected_label']  # extension
@@ -745,8 +1338,61 @@ class workspace(_createWindow):
         # Fix dpi :
         if dpi == '':
             dpi = 100
-        mpl.rc("savefig", dpi=int(dpi))
-        self._fig.savefig(path+file+ext, bbox_inches='tight')
+        dpi = int(dpi)
+        if self._wVi_batch.value:
+            self._saveBatch(path, file, ext, dpi)
+            return
+        savefile = os.path.join(path, file+ext)
+        if self._saveExec is None:
+            self._saveExec = ThreadPoolExecutor(max_workers=1)
+        self._wVi_txt.value = 'Saving '+savefile+'...'
+        self._wVi_txt.visible = True
+        future = self._saveExec.submit(self._fig.savefig, savefile, dpi=dpi, bbox_inches='tight')
+        future.add_done_callback(lambda f: self._saveDone(f, savefile))
+
+    def _saveDone(self, future, savefile):
+        """Confirmation text once a figure is saved"""
+        if future.exception() is not None:
+            self._wVi_txt.value = savefile+' not saved : '+str(future.exception())
+        else:
+            self._wVi_txt.value = savefile+' saved :D'
+
+    def _saveBatch(self, path, file, ext, dpi):
+        """Render and save one figure per variable in parallel worker
+        processes"""
+        pltfcn = self._wVi_fcn.value
+        kwargs = eval(self._wVi_kwarg.value) if self._wVi_kwarg.value != '' else {}
+        if pltfcn == 'imshow':
+            kwargs.setdefault('cmap', self._wVi_cmap.value or 'viridis')
+        tit, xlab, ylab = self._wVi_tit.value, self._wVi_xlab.value, self._wVi_ylab.value
+        vName = self._checkAxis(self._getPlotNames())
+        done = {'n': 0, 'failed': []}
+
+        def progress(future, name):
+            done['n'] += 1
+            if future.exception() is not None:
+                done['failed'].append(name)
+            txt = 'Saved {0}/{1}'.format(done['n'] - len(done['failed']), len(vName))
+            if done['failed']:
+                txt += ' (failed : '+', '.join(done['failed'])+')'
+            self._wVi_txt.value = txt
+
+        self._wVi_txt.value = 'Saved 0/{0}'.format(len(vName))
+        self._wVi_txt.visible = True
+        # Spawned workers (forking the kernel threads can deadlock), reused
+        # across batches unless more workers are needed :
+        nWorkers = max(1, min(len(vName), os.cpu_count() or 1))
+        if (self._batchExec is None) or (nWorkers > self._batchWorkers):
+            if self._batchExec is not None:
+                self._batchExec.shutdown(wait=False)
+            self._batchExec = ProcessPoolExecutor(
+                max_workers=nWorkers, mp_context=multiprocessing.get_context('spawn'))
+            self._batchWorkers = nWorkers
+        for name in vName:
+            var = self._getPlotVar(name)
+            savefile = os.path.join(path, (file+'_' if file != '' else '')+name+ext)
+            future = self._batchExec.submit(_renderFig, var, pltfcn, kwargs, savefile, dpi, tit, xlab, ylab)
+            future.add_done_callback(lambda f, name=name: progress(f, name))
 
     def _clearFig(self, *arg):
         """Clear saving figure elements"""
@@ -754,6 +1400,227 @@ class workspace(_createWindow):
         self._wVi_file.value = ''
         self._wVi_ext.selected_label = '.png'
         self._wVi_dpi.value = ''
+        self._wVi_batch.value = False
+        self._wVi_txt.visible = False
+
+    # /////////////// VIEWER \\\\\\\\\\\\\\\\\
+    def _viewVar(self, *arg):
+        """Open a variable in the viewer on its first page"""
+        self._viewStart = 0
+        self._viewPage()
+
+    def _viewPrev(self, *arg):
+        """Previous page of the viewer"""
+        self._viewStart = max(0, self._viewStart - self._viewRows())
+        self._viewPage()
+
+    def _viewNext(self, *arg):
+        """Next page of the viewer"""
+        self._viewStart += self._viewRows()
+        self._viewPage()
+
+    def _viewRows(self):
+        """Get the number of rows per page"""
+        rows = self._wVw_rows.value
+        return int(rows) if rows != '' else 20
+
+    def _viewPage(self):
+        """Display the visible window of the variable. Only the visible rows
+        and columns are sliced (iloc for pandas, views for arrays)"""
+        varname = self._wVw_var.value
+        var = self._namespace.shell.user_ns[varname]
+        shape = getattr(var, 'shape', ())
+        nRows = shape[0] if len(shape) else 1
+        n = self._viewRows()
+        self._viewStart = min(self._viewStart, max(0, nRows - n))
+        start, stop = self._viewStart, min(self._viewStart + n, nRows)
+        # Columns and sorting :
+        cols = [k for k in self._wVw_col.value.replace(' ', '').split(sep=',') if k != '']
+        sby = self._wVw_sort.value.strip()
+        asc = self._wVw_order.get_state()['selected_label'] == 'Ascending'
+        if isinstance(var, np.ndarray) and (var.ndim > 0):
+            # Columns and sorting column must be valid indices of axis 1 :
+            nCols = var.shape[1] if var.ndim > 1 else 0
+            bad = [k for k in cols + ([sby] if (sby != '') and (var.ndim == 2) else [])
+                   if (var.ndim > 1) and not (re.match(r'^-?\d+$', k) and (-nCols <= int(k) < nCols))]
+            if bad:
+                self._wVw_txt.value = 'No column <b>{0}</b> in {1}'.format(', '.join(bad), varname)
+                return
+            if (sby != '') and (var.ndim > 2):
+                self._wVw_txt.value = 'Sorting only for 1-D and 2-D arrays'
+                return
+            colIdx = [int(k) for k in cols] if (cols and var.ndim > 1) else slice(None)
+            # 1-D arrays are sorted by value, whatever the sorting column :
+            sby = (int(sby) if var.ndim > 1 else 0) if sby != '' else None
+            perm = self._viewPerm(varname, var, sby, asc) if sby is not None else None
+            rows = perm[start:stop] if perm is not None else slice(start, stop)
+            win = var[rows] if var.ndim == 1 else var[rows][:, colIdx]
+            index = perm[start:stop] if perm is not None else np.arange(start, stop)
+            if win.ndim <= 2:
+                html = DataFrame(win, index=index).to_html()
+            else:
+                html = '<pre>'+str(win)+'</pre>'
+        elif hasattr(var, 'iloc'):        # DataFrame / Series
+            strCols = [str(k) for k in var.columns] if var.ndim == 2 else []
+            if cols and (var.ndim == 2):
+                colIdx = [strCols.index(k) for k in cols if k in strCols]
+            else:
+                colIdx = slice(None)
+            # Sorting column position (Series are sorted by value) :
+            if (sby != '') and (var.ndim == 2) and (sby not in strCols):
+                self._wVw_txt.value = 'No column <b>{0}</b> in {1}'.format(sby, varname)
+                return
+            sby = (strCols.index(sby) if var.ndim == 2 else 0) if sby != '' else None
+            perm = self._viewPerm(varname, var, sby, asc) if sby is not None else None
+            rows = perm[start:stop] if perm is not None else slice(start, stop)
+            win = var.iloc[rows, colIdx] if var.ndim == 2 else var.iloc[rows]
+            html = win.to_html() if var.ndim == 2 else win.to_frame().to_html()
+        else:
+            html = '<pre>'+str(var)+'</pre>'
+        self._wVw_txt.value = '<b>{0}</b> : rows {1}-{2} / {3}'.format(varname, start, stop, nRows)
+        self._wVw_tab.value = """<div style='max-height:600px; overflow:auto'>"""+html+"</div>"
+
+    def _viewPerm(self, varname, var, sby, asc):
+        """Get the sorting permutation of a variable (sby is the position of
+        the sorting column). Permutations are cached until the variable is
+        reassigned or a cell is executed"""
+        ident, perms = self._viewCache.get(varname, (None, {}))
+        if ident != id(var):
+            perms = {}
+            self._viewCache[varname] = (id(var), perms)
+        key = (sby, asc)
+        if (key not in perms) or (len(perms[key]) != var.shape[0]):
+            if isinstance(var, np.ndarray):
+                col = var if var.ndim == 1 else var[:, sby]
+                if asc:
+                    perm = np.argsort(col, kind='mergesort')
+                else:
+                    # Stable descending order, NaN last (like pandas) :
+                    perm = len(col) - 1 - np.argsort(col[::-1], kind='mergesort')[::-1]
+                    if col.dtype.kind in 'fc':
+                        isnan = np.isnan(col[perm])
+                        perm = np.concatenate([perm[~isnan], perm[isnan]])
+                perms[key] = perm
+            else:
+                col = var.iloc[:, sby] if var.ndim == 2 else var
+                col = col.reset_index(drop=True)
+                perms[key] = col.sort_values(ascending=asc, kind='mergesort').index.values
+        return perms[key]
+
+    def _clearView(self, *arg):
+        """Clear the viewer"""
+        if self._wVw_var.value in self._viewCache:
+            self._viewCache.pop(self._wVw_var.value)
+        self._wVw_var.value = ''
+        self._wVw_col.value = ''
+        self._wVw_sort.value = ''
+        self._wVw_rows.value = ''
+        self._wVw_order.selected_label = 'Ascending'
+        self._wVw_txt.value = ''
+        self._wVw_tab.value = ''
+        self._viewStart = 0
+
+    # /////////////// MEMORY \\\\\\\\\\\\\\\\\
+    def _getVarBytes(self, name):
+        """Get variables sizes in bytes. Array sizes are read from their
+        metadata. Immutable objects can't change size so their size is cached,
+        with a weak reference to check that the object is still the same"""
+        var = self._namespace.shell.user_ns
+        fixed = (str, bytes, tuple, int, float, complex, frozenset)
+        nbytes = []
+        for n in name:
+            v = var[n]
+            if (n in self._memIds) and (self._memIds[n][0]() is v):
+                nbytes.append(self._memIds[n][1])
+                continue
+            if isinstance(v, np.ndarray):
+                nb = v.nbytes
+            elif hasattr(v, 'memory_usage'):    # DataFrame / Series
+                try:
+                    nb = int(np.sum(v.memory_usage(index=True)))
+                except:
+                    nb = sys.getsizeof(v)
+            else:
+                nb = sys.getsizeof(v)
+            self._memIds.pop(n, None)
+            if isinstance(v, fixed):
+                try:
+                    self._memIds[n] = (weakref.ref(v), nb)
+                except TypeError:   # No weak reference (Ex : int, str)
+                    pass
+            nbytes.append(nb)
+        return nbytes
+
+    def _trackMem(self):
+        """Add the size in bytes of each variable to its ring buffer"""
+        names = self._getVarName()
+        # Forget deleted variables :
+        for n in set(self._memHist.keys()) - set(names):
+            self._memHist.pop(n)
+            self._memIds.pop(n, None)
+        # Fill ring buffers :
+        idx = self._memCell % self._memN
+        for n, nb in zip(names, self._getVarBytes(names)):
+            if n not in self._memHist:
+                self._memHist[n] = np.full(self._memN, np.nan)
+            self._memHist[n][idx] = nb
+        self._memCell += 1
+
+    def _memGrowth(self):
+        """Get the variables that grew the most over the last cells. Return a
+        list of (name, growth in bytes, growth rate in bytes/cell)"""
+        nCell = min(self._memCell, self._memN)
+        if nCell < 2:
+            return []
+        # Chronological order of the ring buffer :
+        order = (np.arange(self._memCell - nCell, self._memCell)) % self._memN
+        growth = []
+        for n, hist in self._memHist.items():
+            h = hist[order]
+            h = h[~np.isnan(h)]
+            if (len(h) < 2) or (h[-1] <= h[0]):
+                continue
+            growth.append((n, h[-1] - h[0], (h[-1] - h[0]) / (len(h) - 1)))
+        growth.sort(key=lambda k: k[1], reverse=True)
+        return growth[0:self._memTop]
+
+    def _memReport(self, growth):
+        """Display the variables that grew the most"""
+        if not growth:
+            self._wMem_txt.value = 'No memory growth over the last {0} cells'.format(
+                min(self._memCell, self._memN))
+            return
+        rowLayout = "<tr><td>{0}</td><td>{1}</td><td>{2}/cell</td></tr>"
+        self._wMem_txt.value = """
+        <table class="table table-bordered table-striped'">
+            <tr><th>Name</th><th>Growth</th><th>Rate</th></tr>
+            """ + ''.join([rowLayout.format(n, _fmtBytes(g), _fmtBytes(r)) for n, g, r in growth]) + """
+        </table>"""
+
+    def _memSettings(self, *arg):
+        """Update history length and number of highlighted variables"""
+        hist = self._wMem_hist.value
+        top = self._wMem_top.value
+        self._memTop = int(top) if top != '' else 5
+        memN = int(hist) if hist != '' else 20
+        if memN != self._memN:
+            # Keep the most recent values in the new ring buffers :
+            nKeep = min(self._memCell, self._memN, memN)
+            order = (np.arange(self._memCell - nKeep, self._memCell)) % self._memN
+            for n, hist in self._memHist.items():
+                newHist = np.full(memN, np.nan)
+                newHist[0:nKeep] = hist[order]
+                self._memHist[n] = newHist
+            self._memN, self._memCell = memN, nKeep
+        self._fill()
+
+    def _clearMem(self, *arg):
+        """Clear memory settings and history"""
+        self._wMem_hist.value = ''
+        self._wMem_top.value = ''
+        self._memN, self._memTop, self._memCell = 20, 5, 0
+        self._memHist, self._memIds = {}, {}
+        self._fill()
 
     # /////////////// SYSTEM \\\\\\\\\\\\\\\\\
     def _getVarName(self):